@@ -24,6 +24,7 @@ setup(
     use_scm_version=True,
     python_requires='>=3.8',
     install_requires=['botocore'],
+    extras_require={'fast': ['lru-dict']},
     setup_requires=['pytest-runner', 'setuptools-scm'],
     tests_require=['pytest', 'pytest-cov', 'pytest-sugar', 'codecov']
 
@@ -16,6 +16,6 @@
     namespace staying consistent. Directly reference at your own risk.
 """
 from aws_secretsmanager_caching.cache.items import SecretCacheItem, SecretCacheObject, SecretCacheVersion
-from aws_secretsmanager_caching.cache.lru import LRUCache
+from aws_secretsmanager_caching.cache.lru import LRUCache, StripedLRUCache
 
-__all__ = ["SecretCacheObject", "SecretCacheItem", "SecretCacheVersion", "LRUCache"]
+__all__ = ["SecretCacheObject", "SecretCacheItem", "SecretCacheVersion", "LRUCache", "StripedLRUCache"]
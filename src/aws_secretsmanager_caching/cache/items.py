@@ -17,10 +17,35 @@ import threading
 import time
 from abc import ABCMeta, abstractmethod
 from copy import deepcopy
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 from random import randint
 
-from .lru import LRUCache
+from .lru import LRUCache, _NullLock
+
+# Leaf types found in Secrets Manager responses that never need copying
+_IMMUTABLE_TYPES = (str, bytes, int, float, bool, type(None), datetime)
+
+
+def _fast_clone(obj):
+    """Deep copy a JSON-like Secrets Manager response.
+
+    Dicts and lists are rebuilt recursively and immutable leaves are shared,
+    which is much cheaper than copy.deepcopy for this restricted shape. Any
+    other type, e.g. one produced by a secret cache hook, is handed to deepcopy.
+
+    :type obj: object
+    :param obj: The object to copy.
+
+    :rtype: object
+    :return: The copied object.
+    """
+    if isinstance(obj, dict):
+        return {key: _fast_clone(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_fast_clone(value) for value in obj]
+    if isinstance(obj, _IMMUTABLE_TYPES):
+        return obj
+    return deepcopy(obj)
 
 
 class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
@@ -28,6 +53,10 @@ class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
     # Jitter max for refresh now
     FORCE_REFRESH_JITTER_SLEEP = 5000
     __metaclass__ = ABCMeta
+    __slots__ = (
+        "_lock", "_config", "_hook", "_client", "_secret_id", "_result", "_exception", "_exception_count",
+        "_refresh_needed", "_next_retry_time",
+    )
 
     def __init__(self, config, client, secret_id):
         """Construct the secret cache object.
@@ -41,14 +70,16 @@ class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
         :type secret_id: str
         :param secret_id: The secret identifier to cache.
         """
-        self._lock = threading.RLock()
+        self._lock = threading.Lock() if config.thread_safe else _NullLock()
         self._config = config
+        self._hook = config.secret_cache_hook
         self._client = client
         self._secret_id = secret_id
         self._result = None
         self._exception = None
         self._exception_count = 0
         self._refresh_needed = True
+        # Deadlines are tracked on the time.monotonic() clock
         self._next_retry_time = None
 
     def _is_refresh_needed(self):
@@ -63,7 +94,7 @@ class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
             return False
         if self._next_retry_time is None:
             return False
-        return self._next_retry_time <= datetime.now(timezone.utc)
+        return self._next_retry_time <= time.monotonic()
 
     @abstractmethod
     def _execute_refresh(self):
@@ -99,12 +130,10 @@ class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
             self._exception_count = 0
         except Exception as e:  # pylint: disable=broad-except
             self._exception = e
-            delay = self._config.exception_retry_delay_base * (
-                self._config.exception_retry_growth_factor ** self._exception_count
-            )
+            delay = self._config._retry_delay(self._exception_count)  # pylint: disable=protected-access
             self._exception_count += 1
-            delay = min(delay, self._config.exception_retry_delay_max)
-            self._next_retry_time = datetime.now(timezone.utc) + timedelta(milliseconds=delay)
+            # The delay is in milliseconds, the monotonic clock in seconds
+            self._next_retry_time = time.monotonic() + delay / 1000
 
     def get_secret_value(self, version_stage=None):
         """Get the cached secret value for the given version stage.
@@ -115,14 +144,24 @@ class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
         :rtype: object
         :return: The cached secret value.
         """
+        config = self._config
+        get_version = self._get_version
         if not version_stage:
-            version_stage = self._config.default_version_stage
-        with self._lock:
-            self.__refresh()
-            value = self._get_version(version_stage)
-            if not value and self._exception:
-                raise self._exception
-            return deepcopy(value)
+            version_stage = config.default_version_stage
+        value = None
+        if not self._is_refresh_needed():
+            # Nothing to refresh, so a cached value can be served without the lock
+            value = get_version(version_stage)
+        if not value:
+            with self._lock:
+                self.__refresh()
+                value = get_version(version_stage)
+                exception = self._exception
+                if not value and exception:
+                    raise exception
+        if config.copy_on_get:
+            return _fast_clone(value)
+        return value
 
     def refresh_secret_now(self):
         """Force a refresh of the cached secret.
@@ -135,8 +174,7 @@ class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
         sleep = randint(int(self.FORCE_REFRESH_JITTER_SLEEP / 2), self.FORCE_REFRESH_JITTER_SLEEP + 1)
 
         if self._exception is not None:
-            current_time_millis = int(datetime.now(timezone.utc).timestamp() * 1000)
-            exception_sleep = self._next_retry_time - current_time_millis
+            exception_sleep = (self._next_retry_time - time.monotonic()) * 1000
             sleep = max(exception_sleep, sleep)
 
         # Divide by 1000 for millis
@@ -146,22 +184,25 @@ class SecretCacheObject:  # pylint: disable=too-many-instance-attributes
 
     def _get_result(self):
         """Get the stored result using a hook if present"""
-        if self._config.secret_cache_hook is None:
+        hook = self._hook
+        if hook is None:
             return self._result
 
-        return self._config.secret_cache_hook.get(self._result)
+        return hook.get(self._result)
 
     def _set_result(self, result):
         """Store the given result using a hook if present"""
-        if self._config.secret_cache_hook is None:
+        hook = self._hook
+        if hook is None:
             self._result = result
             return
 
-        self._result = self._config.secret_cache_hook.put(result)
+        self._result = hook.put(result)
 
 
 class SecretCacheItem(SecretCacheObject):
     """The secret cache item that maintains a cache of secret versions."""
+    __slots__ = ("_versions", "_stage_index", "_next_refresh_time")
 
     def __init__(self, config, client, secret_id):
         """Construct a secret cache item.
@@ -177,8 +218,9 @@ class SecretCacheItem(SecretCacheObject):
         :param secret_id: The secret identifier to cache.
         """
         super(SecretCacheItem, self).__init__(config, client, secret_id)
-        self._versions = LRUCache(10)
-        self._next_refresh_time = datetime.now(timezone.utc)
+        self._versions = LRUCache(10, thread_safe=config.thread_safe)
+        self._stage_index = {}
+        self._next_refresh_time = time.monotonic()
 
     def _is_refresh_needed(self):
         """Determine if the cached item should be refreshed.
@@ -190,29 +232,27 @@ class SecretCacheItem(SecretCacheObject):
             return True
         if self._exception:
             return False
-        return self._next_refresh_time <= datetime.now(timezone.utc)
+        return self._next_refresh_time <= time.monotonic()
 
     @staticmethod
-    def _get_version_id(result, version_stage):
-        """Get the version id for the given version stage.
+    def _get_stage_index(result):
+        """Build the version stage to version id mapping for the given result.
 
         :type: dict
         :param result: The result of the DescribeSecret request.
 
-        :type version_stage: str
-        :param version_stage: The version stage being requested.
-
-        :rtype: str
-        :return: The associated version id.
+        :rtype: dict
+        :return: The version id associated with each version stage.
         """
         if not result:
-            return None
+            return {}
         if "VersionIdsToStages" not in result:
-            return None
-        ids = [key for (key, value) in result["VersionIdsToStages"].items() if version_stage in value]
-        if not ids:
-            return None
-        return ids[0]
+            return {}
+        index = {}
+        for version_id, stages in result["VersionIdsToStages"].items():
+            for stage in stages:
+                index.setdefault(stage, version_id)
+        return index
 
     def _execute_refresh(self):
         """Perform the actual refresh of the cached secret information.
@@ -222,9 +262,15 @@ class SecretCacheItem(SecretCacheObject):
         """
         result = self._client.describe_secret(SecretId=self._secret_id)
         ttl = self._config.secret_refresh_interval
-        self._next_refresh_time = datetime.now(timezone.utc) + timedelta(seconds=randint(round(ttl / 2), ttl))
+        self._next_refresh_time = time.monotonic() + randint(ttl // 2, ttl)
         return result
 
+    def _set_result(self, result):
+        """Store the given result and index its version stages"""
+        super(SecretCacheItem, self)._set_result(result)
+        # Index what the hook hands back, so stage lookups see its transformation
+        self._stage_index = self._get_stage_index(self._get_result())
+
     def _get_version(self, version_stage):
         """Get the version associated with the given stage.
 
@@ -234,19 +280,18 @@ class SecretCacheItem(SecretCacheObject):
         :rtype: dict
         :return: The cached secret for the given version stage.
         """
-        version_id = self._get_version_id(self._get_result(), version_stage)
+        version_id = self._stage_index.get(version_stage)
         if not version_id:
             return None
-        version = self._versions.get(version_id)
-        if version:
-            return version.get_secret_value()
-        self._versions.put_if_absent(version_id, SecretCacheVersion(self._config, self._client, self._secret_id,
-                                                                    version_id))
-        return self._versions.get(version_id).get_secret_value()
+        version = self._versions.get_or_create(
+            version_id, lambda: SecretCacheVersion(self._config, self._client, self._secret_id, version_id)
+        )
+        return version.get_secret_value()
 
 
 class SecretCacheVersion(SecretCacheObject):
     """Secret cache object for a secret version."""
+    __slots__ = ("_version_id",)
 
     def __init__(self, config, client, secret_id, version_id):
         """Construct the cache object for a secret version.
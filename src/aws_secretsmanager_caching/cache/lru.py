@@ -13,39 +13,77 @@
 """LRU cache"""
 
 import threading
+from collections import OrderedDict
+
+try:
+    # Optional C implementation, installed with the "fast" extra
+    from lru import LRU as _NativeLRU
+except ImportError:
+    _NativeLRU = None
 
 
 class LRUCache:
-    """Least recently used cache"""
+    """Least recently used cache
+
+    When the optional ``lru-dict`` package is installed, recency tracking
+    and eviction are delegated to its C implementation.
+    """
+    __slots__ = ("_lock", "_cache", "_max_size", "_native")
 
-    def __init__(self, max_size=1024):
+    def __init__(self, max_size=1024, thread_safe=True):
         """Construct a new instance of the LRU cache
 
         :type max_size: int
         :param max_size: The maximum number of elements to store in the cache
+
+        :type thread_safe: bool
+        :param thread_safe: Guard writes with a lock. Only disable this when the
+            cache is never used from more than one thread.
         """
-        self._lock = threading.RLock()
-        self._cache = {}
-        self._head = None
-        self._tail = None
+        self._lock = threading.Lock() if thread_safe else _NullLock()
         self._max_size = max_size
-        self._size = 0
+        # lru-dict cannot represent an empty cache, keep the fallback for that case
+        self._native = _NativeLRU is not None and max_size > 0
+        self._cache = _NativeLRU(max_size) if self._native else OrderedDict()
 
     def get(self, key):
         """Get the cached item for the given key
 
+        The lookup itself does not take the lock. Without lru-dict, recency
+        is only updated when the lock is free, so the LRU ordering is
+        best-effort while another thread is writing to the cache.
+
         :type key: object
         :param key: Key of the cached item
 
         :rtype: object
         :return: The cached item associated with the key
         """
-        with self._lock:
-            if key not in self._cache:
-                return None
-            item = self._cache[key]
-            self._update_head(item)
-            return item.data
+        data = self._cache.get(key)
+        if data is None:
+            return None
+        if not self._native:
+            self._try_promote(key)
+        return data
+
+    def _try_promote(self, key):
+        """Mark the given key as the most recently used if the lock is free.
+
+        :type key: object
+        :param key: Key of the cached item
+
+        :rtype: None
+        :return: None
+        """
+        if not self._lock.acquire(blocking=False):  # pylint: disable=consider-using-with
+            return
+        try:
+            self._cache.move_to_end(key)
+        except KeyError:
+            # Evicted between the lookup and the promotion
+            pass
+        finally:
+            self._lock.release()
 
     def put_if_absent(self, key, data):
         """Associate the given item with the key if the key is not already associated with an item.
@@ -59,78 +97,144 @@ class LRUCache:
         :rtype: bool
         :return: True if the given data was mapped to the given key.
         """
+        cache = self._cache
         with self._lock:
-            if key in self._cache:
+            if key in cache:
                 return False
-            item = LRUItem(key=key, data=data)
-            self._cache[key] = item
-            self._size += 1
-            self._update_head(item)
-            if self._size > self._max_size:
-                del self._cache[self._tail.key]
-                self._unlink(self._tail)
-                self._size -= 1
+            cache[key] = data
+            if len(cache) > self._max_size:
+                # The least recently used item is kept at the front
+                cache.popitem(last=False)
             return True
 
-    def _update_head(self, item):
-        """Update the head item in the list to be the given item.
+    def get_or_create(self, key, factory):
+        """Get the cached item for the given key, creating and caching it if absent.
+
+        :type key: object
+        :param key: Key of the cached item
 
-        :type item: object
-        :param item: The item that should be updated as the head item.
+        :type factory: callable
+        :param factory: Called without arguments to build the item when the key
+            is not cached. It is only called while holding the lock, so concurrent
+            callers never build an item that is then thrown away.
 
-        :rtype: None
-        :return: None
+        :rtype: object
+        :return: The cached item associated with the key
         """
-        if item is self._head:
-            return
-        self._unlink(item)
-        item.next = self._head
-        if self._head is not None:
-            self._head.prev = item
-        self._head = item
-        if self._tail is None:
-            self._tail = item
+        data = self.get(key)
+        if data is not None:
+            return data
+        cache = self._cache
+        with self._lock:
+            data = cache.get(key)
+            if data is not None:
+                return data
+            data = factory()
+            cache[key] = data
+            if len(cache) > self._max_size:
+                cache.popitem(last=False)
+            return data
+
+
+class StripedLRUCache:
+    """Least recently used cache split across independently locked stripes
+
+    Keys are assigned to a stripe by hash, so writers for different keys
+    mostly contend on different locks. Eviction is decided per stripe,
+    which makes the overall ordering an approximation of a single LRU and
+    lets a stripe evict before the cache as a whole holds max_size items.
+    With a single stripe it behaves exactly like LRUCache.
+    """
+    __slots__ = ("_stripes",)
+
+    def __init__(self, max_size=1024, stripes=1, thread_safe=True):
+        """Construct a new instance of the striped LRU cache
+
+        :type max_size: int
+        :param max_size: The maximum number of elements to store in the cache
 
-    def _unlink(self, item):
-        """Unlink the given item from the linked list.
+        :type stripes: int
+        :param stripes: The number of stripes to split the cache into
 
-        :type item: object
-        :param item: The item to unlink from the linked list.
+        :type thread_safe: bool
+        :param thread_safe: Guard writes to each stripe with a lock.
+        """
+        # Never create more stripes than elements, or some would hold nothing
+        count = max(1, min(stripes, max_size))
+        self._stripes = tuple(
+            LRUCache(max_size=max_size // count + (1 if i < max_size % count else 0), thread_safe=thread_safe)
+            for i in range(count)
+        )
 
-        :rtype: None
-        :return: None
+    def _stripe(self, key):
+        """Get the stripe responsible for the given key.
+
+        :type key: object
+        :param key: Key of the cached item
+
+        :rtype: LRUCache
+        :return: The stripe holding the key
         """
-        if item is self._head:
-            self._head = item.next
-        if item is self._tail:
-            self._tail = item.prev
-        if item.prev is not None:
-            item.prev.next = item.next
-        if item.next is not None:
-            item.next.prev = item.prev
-        item.next = None
-        item.prev = None
+        return self._stripes[hash(key) % len(self._stripes)]
+
+    def get(self, key):
+        """Get the cached item for the given key
 
+        :type key: object
+        :param key: Key of the cached item
 
-class LRUItem:
-    """An item for use in the LRU cache."""
+        :rtype: object
+        :return: The cached item associated with the key
+        """
+        return self._stripe(key).get(key)
 
-    def __init__(self, key, data=None, prev=None, nxt=None):
-        """Construct an item for use within the LRU cache.
+    def put_if_absent(self, key, data):
+        """Associate the given item with the key if the key is not already associated with an item.
 
         :type key: object
-        :param key: The key associated with the item.
+        :param key: The key for the item to cache.
 
         :type data: object
-        :param data: The associated data for the key/item.
+        :param data: The item to cache if the key is not already in use.
+
+        :rtype: bool
+        :return: True if the given data was mapped to the given key.
+        """
+        return self._stripe(key).put_if_absent(key, data)
+
+    def get_or_create(self, key, factory):
+        """Get the cached item for the given key, creating and caching it if absent.
+
+        :type key: object
+        :param key: Key of the cached item
+
+        :type factory: callable
+        :param factory: Called without arguments to build the item when the key
+            is not cached.
+
+        :rtype: object
+        :return: The cached item associated with the key
+        """
+        return self._stripe(key).get_or_create(key, factory)
+
+
+class _NullLock:
+    """Lock stand-in that never blocks, for caches used from a single thread."""
+    __slots__ = ()
 
-        :type prev: LRUItem
-        :param prev: The previous item in the linked list.
+    def __enter__(self):
+        return self
 
-        :type nxt: LRUItem
-        :param nxt: The next item in the linked list.
+    def __exit__(self, *exc_info):
+        return False
+
+    def acquire(self, blocking=True, timeout=-1):  # pylint: disable=unused-argument
+        """Pretend to acquire the lock.
+
+        :rtype: bool
+        :return: Always True
         """
-        self.key = key
-        self.next = nxt
-        self.prev = prev
-        self.data = data
+        return True
+
+    def release(self):
+        """Pretend to release the lock."""
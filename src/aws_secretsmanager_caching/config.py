@@ -12,7 +12,8 @@
 # language governing permissions and limitations under the License.
 """Secret cache configuration object."""
 
-from copy import deepcopy
+# Longest retry delay table to tabulate; later failures use the closed form
+_RETRY_DELAY_TABLE_SIZE = 64
 
 
 class SecretCacheConfig:
@@ -22,6 +23,12 @@ class SecretCacheConfig:
     :type max_cache_size: int
     :param max_cache_size: The maximum number of secrets to cache.
 
+    :type cache_stripes: int
+    :param cache_stripes: The number of independently locked stripes the
+        secret cache is split into. Each stripe holds an equal share of
+        max_cache_size and evicts on its own, so with more than one stripe
+        the cache may evict before max_cache_size secrets are cached.
+
     :type exception_retry_delay_base: int
     :param exception_retry_delay_base: The number of seconds to wait
         after an exception is encountered and before retrying the request.
@@ -45,20 +52,38 @@ class SecretCacheConfig:
     :param secret_cache_hook: An implementation of the SecretCacheHook abstract
         class
 
+    :type max_pool_connections: int
+    :param max_pool_connections: The maximum number of HTTP connections kept
+        open by the client created when no client is given to SecretCache.
+
+    :type thread_safe: bool
+    :param thread_safe: Guard the cache with locks. Setting this to False
+        removes the locking overhead but is only safe when the cache is never
+        shared between threads, e.g. in an AWS Lambda function.
+
+    :type copy_on_get: bool
+    :param copy_on_get: Return a deep copy of the cached secret value on every
+        lookup instead of the cached object itself.
+
     """
 
+    # Copied shallowly for each instance, so every default must be immutable
     OPTION_DEFAULTS = {
         "max_cache_size": 1024,
+        "cache_stripes": 1,
         "exception_retry_delay_base": 1,
         "exception_retry_growth_factor": 2,
         "exception_retry_delay_max": 3600,
         "default_version_stage": "AWSCURRENT",
         "secret_refresh_interval": 3600,
-        "secret_cache_hook": None
+        "secret_cache_hook": None,
+        "max_pool_connections": 50,
+        "thread_safe": True,
+        "copy_on_get": False
     }
 
     def __init__(self, **kwargs):
-        options = deepcopy(self.OPTION_DEFAULTS)
+        options = dict(self.OPTION_DEFAULTS)
 
         # Set config options based on given values
         if kwargs:
@@ -72,3 +97,58 @@ class SecretCacheConfig:
         # Set the attributes based on the config options
         for key, value in options.items():
             setattr(self, key, value)
+
+        # (options, delays) pair, filled in lazily by _retry_delays
+        self._retry_delay_table = None
+
+    @property
+    def _retry_delays(self):
+        """Exponential retry delays up to the point where they saturate.
+
+        The table holds at most _RETRY_DELAY_TABLE_SIZE entries and is rebuilt
+        whenever one of the exception_retry_* options has changed.
+
+        :rtype: tuple
+        :return: The retry delays in milliseconds.
+        """
+        # The options are set dynamically from OPTION_DEFAULTS
+        # pylint: disable=no-member
+        options = (self.exception_retry_delay_base, self.exception_retry_growth_factor,
+                   self.exception_retry_delay_max)
+        table = self._retry_delay_table
+        if table is None or table[0] != options:
+            # Stored as tuples so shallow copies of the config can share them
+            table = self._retry_delay_table = (options, self._tabulate_retry_delays(*options))
+        return table[1]
+
+    def _retry_delay(self, count):
+        """Get the delay before retrying after the given number of failures.
+
+        :type count: int
+        :param count: The number of consecutive failures before this one.
+
+        :rtype: int or float
+        :return: The retry delay in milliseconds.
+        """
+        delays = self._retry_delays
+        if count < len(delays):
+            return delays[count]
+        if len(delays) < _RETRY_DELAY_TABLE_SIZE:
+            # The table stopped short because the delay saturated
+            return delays[-1]
+        # pylint: disable=no-member
+        return min(self.exception_retry_delay_base * (self.exception_retry_growth_factor ** count),
+                   self.exception_retry_delay_max)
+
+    @staticmethod
+    def _tabulate_retry_delays(delay, growth_factor, delay_max):
+        """Build the retry delay table for the given options."""
+        retry_delays = []
+        while delay < delay_max:
+            retry_delays.append(delay)
+            if delay * growth_factor <= delay or len(retry_delays) == _RETRY_DELAY_TABLE_SIZE:
+                break
+            delay *= growth_factor
+        else:
+            retry_delays.append(delay_max)
+        return tuple(retry_delays)
@@ -12,10 +12,12 @@
 # language governing permissions and limitations under the License.
 """Decorators for use with caching library """
 import json
+from operator import itemgetter
 
 
 class InjectSecretString:
     """Decorator implementing high-level Secrets Manager caching client"""
+    __slots__ = ("cache", "secret_id")
 
     def __init__(self, secret_id, cache):
         """
@@ -39,20 +41,21 @@ class InjectSecretString:
         :param func: The function for injecting a single non-keyworded argument too.
         :return The function with the injected argument.
         """
-
-        secret = self.cache.get_secret_string(secret_id=self.secret_id)
+        get_secret_string = self.cache.get_secret_string
+        secret_id = self.secret_id
 
         def _wrapped_func(*args, **kwargs):
             """
             Internal function to execute wrapped function
             """
-            return func(secret, *args, **kwargs)
+            return func(get_secret_string(secret_id), *args, **kwargs)
 
         return _wrapped_func
 
 
 class InjectKeywordedSecretString:
     """Decorator implementing high-level Secrets Manager caching client using JSON-based secrets"""
+    __slots__ = ("cache", "secret_id", "kwarg_map", "_kwarg_names", "_kwarg_getter")
 
     def __init__(self, secret_id, cache, **kwargs):
         """
@@ -71,6 +74,9 @@ class InjectKeywordedSecretString:
 
         self.cache = cache
         self.kwarg_map = kwargs
+        # The argument names and secret keys are fixed, so build the lookup once
+        self._kwarg_names = tuple(kwargs)
+        self._kwarg_getter = itemgetter(*kwargs.values()) if kwargs else lambda secret: ()
         self.secret_id = secret_id
 
     def __call__(self, func):
@@ -82,22 +88,47 @@ class InjectKeywordedSecretString:
         :return The original function with injected keyword arguments
         """
 
-        try:
-            secret = json.loads(self.cache.get_secret_string(secret_id=self.secret_id))
-        except json.decoder.JSONDecodeError:
-            raise RuntimeError('Cached secret is not valid JSON') from None
-
-        resolved_kwargs = {}
-        for orig_kwarg, secret_key in self.kwarg_map.items():
-            try:
-                resolved_kwargs[orig_kwarg] = secret[secret_key]
-            except KeyError:
-                raise RuntimeError(f'Cached secret does not contain key {secret_key}') from None
+        # Pair of the last secret string seen and the keyword arguments resolved
+        # from it. The cache usually hands back the same string object until the
+        # secret changes, so the identity check skips parsing on most calls; a
+        # hook that builds a new string on each get falls back to equality.
+        get_secret_string = self.cache.get_secret_string
+        secret_id = self.secret_id
+        resolve_kwargs = self._resolve_kwargs
+        secret_string = get_secret_string(secret_id)
+        resolved = (secret_string, resolve_kwargs(secret_string))
 
         def _wrapped_func(*args, **kwargs):
             """
             Internal function to execute wrapped function
             """
-            return func(*args, **resolved_kwargs, **kwargs)
+            nonlocal resolved
+            current = resolved
+            secret_string = get_secret_string(secret_id)
+            if secret_string is not current[0] and secret_string != current[0]:
+                current = resolved = (secret_string, resolve_kwargs(secret_string))
+            return func(*args, **current[1], **kwargs)
 
         return _wrapped_func
+
+    def _resolve_kwargs(self, secret_string):
+        """
+        Resolve the keyword arguments to inject from the given secret string.
+
+        :type secret_string: str
+        :param secret_string: The JSON-encoded secret string
+        :return The keyword arguments mapped to their secret values
+        """
+        try:
+            secret = json.loads(secret_string)
+        except json.decoder.JSONDecodeError:
+            raise RuntimeError('Cached secret is not valid JSON') from None
+
+        try:
+            values = self._kwarg_getter(secret)
+        except KeyError as e:
+            raise RuntimeError(f'Cached secret does not contain key {e.args[0]}') from None
+        # itemgetter returns a bare value rather than a tuple for a single key
+        if len(self._kwarg_names) == 1:
+            values = (values,)
+        return dict(zip(self._kwarg_names, values))
@@ -11,23 +11,49 @@
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
 """High level AWS Secrets Manager caching client."""
-from copy import deepcopy
+from copy import copy
+from functools import lru_cache
 
-from importlib.metadata import version, PackageNotFoundError
 import botocore.config
 import botocore.session
 
-from .cache import LRUCache, SecretCacheItem
+from .cache import LRUCache, SecretCacheItem, StripedLRUCache
 from .config import SecretCacheConfig
 
 
-class SecretCache:
-    """Secret Cache client for AWS Secrets Manager secrets"""
+@lru_cache(maxsize=None)
+def _get_version():
+    """Look up the installed package version on first use.
+
+    importlib.metadata is slow to import and to scan sys.path with, so this
+    is kept off the import path of the library.
+    """
+    from importlib.metadata import version, PackageNotFoundError  # pylint: disable=import-outside-toplevel
 
     try:
-        __version__ = version('aws_secretsmanager_caching')
+        return version('aws_secretsmanager_caching')
     except PackageNotFoundError:
-        __version__ = '0.0.0'
+        return '0.0.0'
+
+
+@lru_cache(maxsize=None)
+def _get_boto_config(max_pool_connections):
+    """Get the botocore config shared by auto-created clients with this pool size."""
+    return botocore.config.Config(user_agent_extra=f"AwsSecretCache/{_get_version()}", tcp_keepalive=True,
+                                  max_pool_connections=max_pool_connections)
+
+
+class _LazyVersion:
+    """Descriptor resolving the package version when it is first read."""
+
+    def __get__(self, obj, objtype=None):
+        return _get_version()
+
+
+class SecretCache:
+    """Secret Cache client for AWS Secrets Manager secrets"""
+
+    __version__ = _LazyVersion()
 
     def __init__(self, config=SecretCacheConfig(), client=None):
         """Construct a secret cache using the given configuration and
@@ -41,12 +67,18 @@ class SecretCache:
         """
 
         self._client = client
-        self._config = deepcopy(config)
-        self._cache = LRUCache(max_size=self._config.max_cache_size)
-        boto_config = botocore.config.Config(**{
-            "user_agent_extra": f"AwsSecretCache/{SecretCache.__version__}",
-        })
+        self._config = copy(config)
+        if self._config.cache_stripes > 1:
+            self._cache = StripedLRUCache(
+                max_size=self._config.max_cache_size,
+                stripes=self._config.cache_stripes,
+                thread_safe=self._config.thread_safe,
+            )
+        else:
+            # A single stripe gains nothing from the striping indirection
+            self._cache = LRUCache(max_size=self._config.max_cache_size, thread_safe=self._config.thread_safe)
         if self._client is None:
+            boto_config = _get_boto_config(self._config.max_pool_connections)
             self._client = botocore.session.get_session().create_client("secretsmanager", config=boto_config)
 
     def _get_cached_secret(self, secret_id):
@@ -58,13 +90,9 @@ class SecretCache:
         :rtype: aws_secretsmanager_caching.cache.SecretCacheItem
         :return: The associated cached secret item
         """
-        secret = self._cache.get(secret_id)
-        if secret is not None:
-            return secret
-        self._cache.put_if_absent(
-            secret_id, SecretCacheItem(config=self._config, client=self._client, secret_id=secret_id)
+        return self._cache.get_or_create(
+            secret_id, lambda: SecretCacheItem(config=self._config, client=self._client, secret_id=secret_id)
         )
-        return self._cache.get(secret_id)
 
     def get_secret_string(self, secret_id, version_stage=None):
         """Get the secret string value from the cache.
@@ -79,9 +107,7 @@ class SecretCache:
         :return: The associated secret string value
         """
         secret = self._get_cached_secret(secret_id).get_secret_value(version_stage)
-        if secret is None:
-            return secret
-        return secret.get("SecretString")
+        return None if secret is None else secret.get("SecretString")
 
     def get_secret_binary(self, secret_id, version_stage=None):
         """Get the secret binary value from the cache.
@@ -96,9 +122,7 @@ class SecretCache:
         :return: The associated secret binary value
         """
         secret = self._get_cached_secret(secret_id).get_secret_value(version_stage)
-        if secret is None:
-            return secret
-        return secret.get("SecretBinary")
+        return None if secret is None else secret.get("SecretBinary")
 
     def refresh_secret_now(self, secret_id):
         """Immediately refresh the secret in the cache.
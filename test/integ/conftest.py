@@ -0,0 +1,24 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+import botocore.config
+import botocore.session
+import pytest
+
+# Sized for the concurrent DeleteSecret calls made during cleanup
+MAX_POOL_CONNECTIONS = 16
+
+
+@pytest.fixture(scope='session')
+def client():
+    yield botocore.session.get_session().create_client(
+        'secretsmanager', config=botocore.config.Config(max_pool_connections=MAX_POOL_CONNECTIONS))
@@ -10,14 +10,12 @@
 # distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
 # ANY KIND, either express or implied. See the License for the specific
 # language governing permissions and limitations under the License.
-import inspect
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from uuid import uuid4
 
-import botocore
-import botocore.session
 import pytest
 from aws_secretsmanager_caching.config import SecretCacheConfig
 from aws_secretsmanager_caching.secret_cache import SecretCache
@@ -27,13 +25,32 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
+def _try_delete(client, secret):
+    logger.info(f"Scheduling deletion of secret {secret['Name']}")
+    try:
+        client.delete_secret(SecretId=secret['Name'])
+    except ClientError as e:
+        logger.error(f"Got ClientError {e.response['Error']['Code']} while calling "
+                     f"DeleteSecret for secret {secret['Name']}")
+    except HTTPClientError:
+        logger.error(f"Got HTTPClientError while calling DeleteSecret for secret {secret['Name']}")
+
+
 class TestAwsSecretsManagerCachingInteg:
     fixture_prefix = 'python_caching_integ_test_'
     uuid_suffix = uuid4().hex
 
+    def _secret_name(self, request):
+        return f"{self.fixture_prefix}{request.function.__name__}{self.uuid_suffix}"
+
+    @pytest.fixture(scope='module')
+    def cache(self, client):
+        # Every test uses its own secret name, so the default cache can be shared
+        yield SecretCache(client=client)
+
     @pytest.fixture(scope='module')
-    def client(self):
-        yield botocore.session.get_session().create_client('secretsmanager')
+    def refresh_cache(self, client):
+        yield SecretCache(config=SecretCacheConfig(secret_refresh_interval=1), client=client)
 
     @pytest.fixture(scope='module', autouse=True)
     def pre_test_cleanup(self, client):
@@ -42,23 +59,15 @@ class TestAwsSecretsManagerCachingInteg:
         two_days_ago = datetime.now() - timedelta(days=2)
 
         paginator = client.get_paginator('list_secrets')
-        paginator_config = {'PageSize': 10, 'StartingToken': None}
-        iterator = paginator.paginate(PaginationConfig=paginator_config)
+        # The name filter is a server-side prefix match
+        name_filter = [{'Key': 'name', 'Values': [self.fixture_prefix]}]
+        iterator = paginator.paginate(Filters=name_filter, PaginationConfig={'PageSize': 100})
         try:
-            for page in iterator:
-                logger.info('Fetching results from ListSecretValue...')
-                for secret in page['SecretList']:
-                    if secret['Name'].startswith(TestAwsSecretsManagerCachingInteg.fixture_prefix) and \
-                            (secret['LastChangedDate'] > two_days_ago) and (secret['LastAccessedDate'] > two_days_ago):
-                        old_secrets.append(secret)
-                try:
-                    paginator_config['StartingToken'] = page['NextToken']
-                except KeyError:
-                    logger.info('reached end of list')
-                    break
-                time.sleep(0.5)
+            for secret in iterator.search('SecretList[]'):
+                if (secret['LastChangedDate'] > two_days_ago) and (secret['LastAccessedDate'] > two_days_ago):
+                    old_secrets.append(secret)
         except ClientError as e:
-            logger.error("Got ClientError {0} while calling ListSecrets".format(e.response['Error']['Code']))
+            logger.error(f"Got ClientError {e.response['Error']['Code']} while calling ListSecrets")
         except HTTPClientError:
             logger.error("Got HTTPClientError while calling ListSecrets")
         except NoCredentialsError:
@@ -68,67 +77,50 @@ class TestAwsSecretsManagerCachingInteg:
         if len(old_secrets) == 0:
             logger.info("No previously configured test secrets found")
 
-        for secret in old_secrets:
-            logger.info("Scheduling deletion of secret {}".format(secret['Name']))
-            try:
-                client.delete_secret(SecretId=secret['Name'])
-            except ClientError as e:
-                logger.error("Got ClientError {0} while calling "
-                             "DeleteSecret for secret {1}".format(e.response['Error']['Code'], secret['Name']))
-            except HTTPClientError:
-                logger.error("Got HTTPClientError while calling DeleteSecret for secret {0}".format(secret['Name']))
-            time.sleep(0.5)
+        with ThreadPoolExecutor(max_workers=client.meta.config.max_pool_connections) as executor:
+            list(executor.map(lambda secret: _try_delete(client, secret), old_secrets))
 
         yield None
 
     @pytest.fixture
     def secret_string(self, request, client):
-        name = "{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix, request.function.__name__,
-                                  TestAwsSecretsManagerCachingInteg.uuid_suffix)
+        name = self._secret_name(request)
 
         secret = client.create_secret(Name=name, SecretString='test')
         yield secret
         client.delete_secret(SecretId=secret['ARN'], ForceDeleteWithoutRecovery=True)
 
-    def test_get_secret_string(self, client, secret_string):
-        cache = SecretCache(client=client)
+    def test_get_secret_string(self, client, cache, secret_string):
+        name = secret_string['Name']
         secret = client.get_secret_value(SecretId=secret_string['ARN'])['SecretString']
 
-        for _ in range(10):
-            assert cache.get_secret_string("{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix,
-                                                              inspect.stack()[0][3],
-                                                              TestAwsSecretsManagerCachingInteg.uuid_suffix)) == secret
+        assert cache.get_secret_string(name) == secret  # miss
+        assert cache.get_secret_string(name) == secret  # hit
 
-    def test_get_secret_string_refresh(self, client, secret_string):
-        cache = SecretCache(config=SecretCacheConfig(secret_refresh_interval=1),
-                            client=client)
+    def test_get_secret_string_refresh(self, client, refresh_cache, secret_string):
+        name = secret_string['Name']
         secret = client.get_secret_value(SecretId=secret_string['ARN'])['SecretString']
 
-        for _ in range(10):
-            assert cache.get_secret_string("{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix,
-                                                              inspect.stack()[0][3],
-                                                              TestAwsSecretsManagerCachingInteg.uuid_suffix)) == secret
+        assert refresh_cache.get_secret_string(name) == secret  # miss
+        assert refresh_cache.get_secret_string(name) == secret  # hit
 
         client.put_secret_value(SecretId=secret_string['ARN'],
                                 SecretString='test2', VersionStages=['AWSCURRENT'])
 
-        time.sleep(2)
         secret = client.get_secret_value(SecretId=secret_string['ARN'])['SecretString']
-        for _ in range(10):
-            assert cache.get_secret_string("{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix,
-                                                              inspect.stack()[0][3],
-                                                              TestAwsSecretsManagerCachingInteg.uuid_suffix)) == secret
+        # Poll rather than sleep out the whole refresh interval
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline and refresh_cache.get_secret_string(name) != secret:
+            time.sleep(0.05)
+        assert refresh_cache.get_secret_string(name) == secret
 
-    def test_get_secret_binary_empty(self, client, secret_string):
-        cache = SecretCache(client=client)
-        assert cache.get_secret_binary("{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix,
-                                                          inspect.stack()[0][3],
-                                                          TestAwsSecretsManagerCachingInteg.uuid_suffix)) is None
+    def test_get_secret_binary_empty(self, cache, secret_string):
+        name = secret_string['Name']
+        assert cache.get_secret_binary(name) is None
 
     @pytest.fixture
     def secret_string_stage(self, request, client):
-        name = "{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix, request.function.__name__,
-                                  TestAwsSecretsManagerCachingInteg.uuid_suffix)
+        name = self._secret_name(request)
 
         secret = client.create_secret(Name=name, SecretString='test')
         client.put_secret_value(SecretId=secret['ARN'], SecretString='test2',
@@ -137,37 +129,29 @@ class TestAwsSecretsManagerCachingInteg:
         yield client.describe_secret(SecretId=secret['ARN'])
         client.delete_secret(SecretId=secret['ARN'], ForceDeleteWithoutRecovery=True)
 
-    def test_get_secret_string_stage(self, client, secret_string_stage):
-        cache = SecretCache(client=client)
+    def test_get_secret_string_stage(self, client, cache, secret_string_stage):
+        name = secret_string_stage['Name']
         secret = client.get_secret_value(SecretId=secret_string_stage['ARN'],
                                          VersionStage='AWSPREVIOUS')['SecretString']
 
-        for _ in range(10):
-            assert cache.get_secret_string("{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix,
-                                                              inspect.stack()[0][3],
-                                                              TestAwsSecretsManagerCachingInteg.uuid_suffix),
-                                           'AWSPREVIOUS') == secret
+        assert cache.get_secret_string(name, 'AWSPREVIOUS') == secret  # miss
+        assert cache.get_secret_string(name, 'AWSPREVIOUS') == secret  # hit
 
     @pytest.fixture
     def secret_binary(self, request, client):
-        name = "{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix, request.function.__name__,
-                                  TestAwsSecretsManagerCachingInteg.uuid_suffix)
+        name = self._secret_name(request)
 
         secret = client.create_secret(Name=name, SecretBinary=b'01010101')
         yield secret
         client.delete_secret(SecretId=secret['ARN'], ForceDeleteWithoutRecovery=True)
 
-    def test_get_secret_binary(self, client, secret_binary):
-        cache = SecretCache(client=client)
+    def test_get_secret_binary(self, client, cache, secret_binary):
+        name = secret_binary['Name']
         secret = client.get_secret_value(SecretId=secret_binary['ARN'])['SecretBinary']
 
-        for _ in range(10):
-            assert cache.get_secret_binary("{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix,
-                                                              inspect.stack()[0][3],
-                                                              TestAwsSecretsManagerCachingInteg.uuid_suffix)) == secret
+        assert cache.get_secret_binary(name) == secret  # miss
+        assert cache.get_secret_binary(name) == secret  # hit
 
-    def test_get_secret_string_empty(self, client, secret_binary):
-        cache = SecretCache(client=client)
-        assert cache.get_secret_string("{0}{1}{2}".format(TestAwsSecretsManagerCachingInteg.fixture_prefix,
-                                                          inspect.stack()[0][3],
-                                                          TestAwsSecretsManagerCachingInteg.uuid_suffix)) is None
+    def test_get_secret_string_empty(self, cache, secret_binary):
+        name = secret_binary['Name']
+        assert cache.get_secret_string(name) is None
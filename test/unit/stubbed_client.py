@@ -0,0 +1,50 @@
+# Copyright 2019 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"). You
+# may not use this file except in compliance with the License. A copy of
+# the License is located at
+#
+# http://aws.amazon.com/apache2.0/
+#
+# or in the "license" file accompanying this file. This file is
+# distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF
+# ANY KIND, either express or implied. See the License for the specific
+# language governing permissions and limitations under the License.
+"""
+Shared stubbed Secrets Manager client for the unit test suites
+"""
+import unittest
+
+import botocore.session
+from botocore.stub import Stubber
+
+# Describe response stages shared by every stubbed secret
+CURRENT_VERSIONS = {'01234567890123456789012345678901': ['AWSCURRENT']}
+
+
+def create_client():
+    return botocore.session.get_session().create_client('secretsmanager', region_name='us-west-2')
+
+
+class StubbedClientTestCase(unittest.TestCase):
+    """Builds one botocore client per class and activates a fresh Stubber on it per test"""
+
+    @classmethod
+    def setUpClass(cls):
+        # Loading the service model is the slow part, so build the client once
+        cls.client = create_client()
+
+    def setUp(self):
+        self.stubber = Stubber(self.client)
+        self.stubber.activate()
+        self.addCleanup(self.stubber.deactivate)
+
+    def get_client(self, response=None, versions=None, version_response=None):
+        response = dict(response or {})
+        expected_params = {'SecretId': 'test'}
+        if versions:
+            response['VersionIdsToStages'] = versions
+        self.stubber.add_response('describe_secret', response, expected_params)
+        if version_response is not None:
+            self.stubber.add_response('get_secret_value', version_response)
+        return self.client
@@ -13,40 +13,22 @@
 """
 Unit test suite for high-level functions in aws_secretsmanager_caching
 """
-import unittest
+import os
+from unittest.mock import patch
 
-import botocore
 import pytest
 from botocore.exceptions import ClientError, NoRegionError
-from botocore.stub import Stubber
 
+from aws_secretsmanager_caching.cache import LRUCache, StripedLRUCache
 from aws_secretsmanager_caching.config import SecretCacheConfig
 from aws_secretsmanager_caching.secret_cache import SecretCache
 
-pytestmark = [pytest.mark.unit, pytest.mark.local]
-
-
-class TestAwsSecretsManagerCaching(unittest.TestCase):
-
-    def setUp(self):
-        pass
+from . import stubbed_client
 
-    def get_client(self, response={}, versions=None, version_response=None):
-        client = botocore.session.get_session().create_client(
-            'secretsmanager', region_name='us-west-2')
+pytestmark = [pytest.mark.unit, pytest.mark.local]
 
-        stubber = Stubber(client)
-        expected_params = {'SecretId': 'test'}
-        if versions:
-            response['VersionIdsToStages'] = versions
-        stubber.add_response('describe_secret', response, expected_params)
-        if version_response is not None:
-            stubber.add_response('get_secret_value', version_response)
-        stubber.activate()
-        return client
 
-    def tearDown(self):
-        pass
+class TestAwsSecretsManagerCaching(stubbed_client.StubbedClientTestCase):
 
     def test_default_session(self):
         try:
@@ -60,9 +42,30 @@ class TestAwsSecretsManagerCaching(unittest.TestCase):
         except NoRegionError:
             pass
 
+    @patch.dict(os.environ, {'AWS_DEFAULT_REGION': 'us-west-2'})
+    def test_default_client_config(self):
+        cache = SecretCache(config=SecretCacheConfig(max_pool_connections=25))
+        self.assertEqual(cache._client.meta.config.max_pool_connections, 25)
+        self.assertTrue(cache._client.meta.config.tcp_keepalive)
+
+    def test_version(self):
+        self.assertIsInstance(SecretCache.__version__, str)
+        self.assertEqual(SecretCache(client=self.get_client()).__version__, SecretCache.__version__)
+
+    def test_cache_striping(self):
+        self.assertIsInstance(SecretCache(client=self.client)._cache, LRUCache)
+        striped = SecretCache(config=SecretCacheConfig(cache_stripes=4), client=self.client)
+        self.assertIsInstance(striped._cache, StripedLRUCache)
+
     def test_client_stub(self):
         SecretCache(client=self.get_client())
 
+    def test_config_copied(self):
+        config = SecretCacheConfig()
+        cache = SecretCache(config=config, client=self.get_client())
+        config.default_version_stage = 'changed'
+        self.assertEqual(cache._config.default_version_stage, 'AWSCURRENT')
+
     def test_get_secret_string_none(self):
         cache = SecretCache(client=self.get_client())
         self.assertIsNone(cache.get_secret_string('test'))
@@ -115,8 +118,11 @@ class TestAwsSecretsManagerCaching(unittest.TestCase):
         cache = SecretCache(client=self.get_client(response,
                                                    versions,
                                                    version_response))
-        for _ in range(10):
-            self.assertEqual(secret, cache.get_secret_string('test'))
+        # The default and explicit stage resolve to the same version, so both
+        # share one stubbed fetch
+        for stage in (None, 'AWSCURRENT'):
+            with self.subTest(stage=stage):
+                self.assertEqual(secret, cache.get_secret_string('test', stage))
 
     def test_get_secret_string_refresh(self):
         secret = 'mysecret'
@@ -130,27 +136,13 @@ class TestAwsSecretsManagerCaching(unittest.TestCase):
             client=self.get_client(response,
                                    versions,
                                    version_response))
-        for _ in range(10):
-            self.assertEqual(secret, cache.get_secret_string('test'))
-
-    def test_get_secret_string_stage(self):
-        secret = 'mysecret'
-        response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
-        version_response = {'SecretString': secret}
-        cache = SecretCache(client=self.get_client(response,
-                                                   versions,
-                                                   version_response))
-        for _ in range(10):
-            self.assertEqual(secret, cache.get_secret_string('test',
-                                                             'AWSCURRENT'))
+        self.assertEqual(secret, cache.get_secret_string('test'))  # miss
+        self.assertEqual(secret, cache.get_secret_string('test'))  # hit
 
     def test_get_secret_string_multiple(self):
         cache = SecretCache(client=self.get_client())
-        for _ in range(100):
-            self.assertIsNone(cache.get_secret_string('test'))
+        self.assertIsNone(cache.get_secret_string('test'))  # miss
+        self.assertIsNone(cache.get_secret_string('test'))  # hit
 
     def test_get_secret_binary(self):
         secret = b'01010101'
@@ -162,8 +154,8 @@ class TestAwsSecretsManagerCaching(unittest.TestCase):
         cache = SecretCache(client=self.get_client(response,
                                                    versions,
                                                    version_response))
-        for _ in range(10):
-            self.assertEqual(secret, cache.get_secret_binary('test'))
+        self.assertEqual(secret, cache.get_secret_binary('test'))  # miss
+        self.assertEqual(secret, cache.get_secret_binary('test'))  # hit
 
     def test_get_secret_binary_no_versions(self):
         cache = SecretCache(client=self.get_client())
@@ -194,13 +186,23 @@ class TestAwsSecretsManagerCaching(unittest.TestCase):
         new_refresh_time = secret._next_refresh_time
         self.assertTrue(new_refresh_time > old_refresh_time)
 
+    def test_get_secret_string_no_cache(self):
+        secret = 'mysecret'
+        response = {}
+        versions = {
+            '01234567890123456789012345678901': ['AWSCURRENT']
+        }
+        version_response = {'SecretString': secret}
+        cache = SecretCache(config=SecretCacheConfig(max_cache_size=0),
+                            client=self.get_client(response,
+                                                   versions,
+                                                   version_response))
+        self.assertEqual(secret, cache.get_secret_string('test'))
+
     def test_get_secret_string_exception(self):
-        client = botocore.session.get_session().create_client(
-            'secretsmanager', region_name='us-west-2')
+        for _ in range(3):
+            self.stubber.add_client_error('describe_secret')
 
-        stubber = Stubber(client)
-        cache = SecretCache(client=client)
+        cache = SecretCache(client=self.client)
         for _ in range(3):
-            stubber.add_client_error('describe_secret')
-            stubber.activate()
             self.assertRaises(ClientError, cache.get_secret_binary, 'test')
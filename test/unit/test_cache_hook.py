@@ -13,19 +13,18 @@
 """
 Unit test suite for items module
 """
-import unittest
-
-import botocore
 from aws_secretsmanager_caching.cache.secret_cache_hook import SecretCacheHook
 from aws_secretsmanager_caching.config import SecretCacheConfig
 from aws_secretsmanager_caching.secret_cache import SecretCache
-from botocore.stub import Stubber
+
+from . import stubbed_client
 
 
 class DummySecretCacheHook(SecretCacheHook):
     """A dummy implementation of the SecretCacheHook abstract class for testing"""
 
-    dict = {}
+    def __init__(self):
+        self.dict = {}
 
     def put(self, obj):
         if 'SecretString' in obj:
@@ -39,7 +38,8 @@ class DummySecretCacheHook(SecretCacheHook):
         return key
 
     def get(self, cached_obj):
-        obj = self.dict[cached_obj]
+        # Build a new object on every get, as a decrypting hook would
+        obj = dict(self.dict[cached_obj])
 
         if 'SecretString' in obj:
             obj['SecretString'] = obj['SecretString'] + "+hook_get"
@@ -50,45 +50,39 @@ class DummySecretCacheHook(SecretCacheHook):
         return obj
 
 
-class TestSecretCacheHook(unittest.TestCase):
+class VersionRewritingSecretCacheHook(SecretCacheHook):
+    """A hook that hands back describe results with rewritten version ids"""
+
+    def __init__(self, version_ids):
+        self.version_ids = version_ids
 
-    def setUp(self):
-        pass
+    def put(self, obj):
+        return obj
 
-    def get_client(self, response={}, versions=None, version_response=None):
-        client = botocore.session.get_session().create_client(
-            'secretsmanager', region_name='us-west-2')
+    def get(self, cached_obj):
+        if 'VersionIdsToStages' not in cached_obj:
+            return cached_obj
+        stages = {self.version_ids.get(version_id, version_id): version_stages
+                  for version_id, version_stages in cached_obj['VersionIdsToStages'].items()}
+        return dict(cached_obj, VersionIdsToStages=stages)
 
-        stubber = Stubber(client)
-        expected_params = {'SecretId': 'test'}
-        if versions:
-            response['VersionIdsToStages'] = versions
-        stubber.add_response('describe_secret', response, expected_params)
-        if version_response is not None:
-            stubber.add_response('get_secret_value', version_response)
-        stubber.activate()
-        return client
 
-    def tearDown(self):
-        pass
+class TestSecretCacheHook(stubbed_client.StubbedClientTestCase):
 
     def test_calls_hook_string(self):
         secret = 'mysecret'
         hooked_secret = secret + "+hook_put+hook_get"
         response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
         version_response = {'SecretString': secret}
 
         hook = DummySecretCacheHook()
         config = SecretCacheConfig(secret_cache_hook=hook)
 
         cache = SecretCache(config=config, client=self.get_client(response,
-                                                                  versions,
+                                                                  stubbed_client.CURRENT_VERSIONS,
                                                                   version_response))
 
-        for _ in range(10):
+        for _ in range(2):  # miss, then hit
             fetched_secret = cache.get_secret_string('test')
             self.assertTrue(fetched_secret.startswith(hooked_secret))
 
@@ -96,17 +90,27 @@ class TestSecretCacheHook(unittest.TestCase):
         secret = b'01010101'
         hooked_secret = secret + b'1111111100000000'
         response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
         version_response = {'SecretBinary': secret}
 
         hook = DummySecretCacheHook()
         config = SecretCacheConfig(secret_cache_hook=hook)
 
         cache = SecretCache(config=config, client=self.get_client(response,
-                                                                  versions,
+                                                                  stubbed_client.CURRENT_VERSIONS,
                                                                   version_response))
 
-        for _ in range(10):
-            self.assertEqual(hooked_secret, cache.get_secret_binary('test')[0:24])
+        self.assertEqual(hooked_secret, cache.get_secret_binary('test')[0:24])  # miss
+        self.assertEqual(hooked_secret, cache.get_secret_binary('test')[0:24])  # hit
+
+    def test_hook_used_for_stage_lookup(self):
+        (version_id,) = stubbed_client.CURRENT_VERSIONS
+        hooked_version_id = 'abcdefabcdefabcdefabcdefabcdefab'
+        hook = VersionRewritingSecretCacheHook({version_id: hooked_version_id})
+        config = SecretCacheConfig(secret_cache_hook=hook)
+
+        cache = SecretCache(config=config, client=self.get_client({}, stubbed_client.CURRENT_VERSIONS))
+        self.stubber.add_response('get_secret_value', {'SecretString': 'mysecret'},
+                                  {'SecretId': 'test', 'VersionId': hooked_version_id})
+
+        self.assertEqual(cache.get_secret_string('test'), 'mysecret')
+        self.stubber.assert_no_pending_responses()
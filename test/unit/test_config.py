@@ -20,12 +20,6 @@ from aws_secretsmanager_caching.config import SecretCacheConfig
 
 class TestSecretCacheConfig(unittest.TestCase):
 
-    def setUp(self):
-        pass
-
-    def tearDown(self):
-        pass
-
     def test_simple_config(self):
         self.assertRaises(TypeError, SecretCacheConfig, no='one')
 
@@ -37,3 +31,38 @@ class TestSecretCacheConfig(unittest.TestCase):
     def test_default_secret_refresh_interval_typing(self):
         config = SecretCacheConfig()
         self.assertIsInstance(config.secret_refresh_interval, int)
+
+    def test_retry_delays(self):
+        config = SecretCacheConfig(exception_retry_delay_base=1, exception_retry_growth_factor=2,
+                                   exception_retry_delay_max=10)
+        self.assertEqual(config._retry_delays, (1, 2, 4, 8, 10))
+
+    def test_retry_delays_base_above_max(self):
+        config = SecretCacheConfig(exception_retry_delay_base=20, exception_retry_delay_max=10)
+        self.assertEqual(config._retry_delays, (10,))
+
+    def test_retry_delays_no_growth(self):
+        config = SecretCacheConfig(exception_retry_delay_base=5, exception_retry_growth_factor=1)
+        self.assertEqual(config._retry_delays, (5,))
+
+    def test_retry_delays_shrinking_growth(self):
+        config = SecretCacheConfig(exception_retry_delay_base=5, exception_retry_growth_factor=0.5)
+        self.assertEqual(config._retry_delays, (5,))
+
+    def test_retry_delays_follow_option_changes(self):
+        config = SecretCacheConfig(exception_retry_delay_base=1, exception_retry_growth_factor=2)
+        self.assertEqual(len(config._retry_delays), 13)
+        config.exception_retry_delay_max = 10
+        self.assertEqual(config._retry_delays, (1, 2, 4, 8, 10))
+
+    def test_retry_delays_unbounded_max(self):
+        config = SecretCacheConfig(exception_retry_delay_max=float('inf'))
+        self.assertEqual(len(config._retry_delays), 64)
+        self.assertEqual(config._retry_delay(3), 8)
+        self.assertEqual(config._retry_delay(100), 2 ** 100)
+
+    def test_retry_delay_saturates(self):
+        config = SecretCacheConfig(exception_retry_delay_base=1, exception_retry_growth_factor=2,
+                                   exception_retry_delay_max=10)
+        self.assertEqual(config._retry_delay(2), 4)
+        self.assertEqual(config._retry_delay(100), 10)
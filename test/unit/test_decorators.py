@@ -15,41 +15,48 @@ Unit test suite for decorators module
 """
 import json
 import unittest
+from unittest.mock import Mock, patch
 
-import botocore
+from aws_secretsmanager_caching.config import SecretCacheConfig
 from aws_secretsmanager_caching.decorators import InjectKeywordedSecretString, InjectSecretString
 from aws_secretsmanager_caching.secret_cache import SecretCache
 from botocore.stub import Stubber
 
-
-class TestAwsSecretsManagerCachingInjectKeywordedSecretStringDecorator(unittest.TestCase):
-
-    def get_client(self, response={}, versions=None, version_response=None):
-        client = botocore.session.get_session().create_client('secretsmanager', region_name='us-west-2')
-        stubber = Stubber(client)
-        expected_params = {'SecretId': 'test'}
-        if versions:
-            response['VersionIdsToStages'] = versions
-        stubber.add_response('describe_secret', response, expected_params)
-        if version_response is not None:
-            stubber.add_response('get_secret_value', version_response)
-        stubber.activate()
-        return client
+from . import stubbed_client
+from .test_cache_hook import DummySecretCacheHook
+
+
+def _primed_cache(client, secret_string, config=None):
+    """Return a SecretCache on client that has already fetched secret_string as 'test'"""
+    if config is None:
+        config = SecretCacheConfig()
+    stubber = Stubber(client)
+    stubber.add_response('describe_secret',
+                         {'VersionIdsToStages': stubbed_client.CURRENT_VERSIONS},
+                         {'SecretId': 'test'})
+    stubber.add_response('get_secret_value', {'SecretString': secret_string})
+    with stubber:
+        cache = SecretCache(config=config, client=client)
+        cache.get_secret_string('test')
+    return cache
+
+
+class TestAwsSecretsManagerCachingInjectKeywordedSecretStringDecorator(stubbed_client.StubbedClientTestCase):
+    secret = {
+        'username': 'secret_username',
+        'password': 'secret_password'
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The decorators look the secret up on every call, so tests that
+        # expect the same secret can share one cache
+        cls.cache = _primed_cache(cls.client, json.dumps(cls.secret))
 
     def test_valid_json(self):
-        secret = {
-            'username': 'secret_username',
-            'password': 'secret_password'
-        }
-
-        secret_string = json.dumps(secret)
-
-        response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
-        version_response = {'SecretString': secret_string}
-        cache = SecretCache(client=self.get_client(response, versions, version_response))
+        secret = self.secret
+        cache = self.cache
 
         @InjectKeywordedSecretString(secret_id='test', cache=cache, func_username='username', func_password='password')
         def function_to_be_decorated(func_username, func_password, keyworded_argument='foo'):
@@ -61,19 +68,8 @@ class TestAwsSecretsManagerCachingInjectKeywordedSecretStringDecorator(unittest.
         self.assertEqual(function_to_be_decorated(), 'OK')
 
     def test_valid_json_with_mixed_args(self):
-        secret = {
-            'username': 'secret_username',
-            'password': 'secret_password'
-        }
-
-        secret_string = json.dumps(secret)
-
-        response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
-        version_response = {'SecretString': secret_string}
-        cache = SecretCache(client=self.get_client(response, versions, version_response))
+        secret = self.secret
+        cache = self.cache
 
         @InjectKeywordedSecretString(secret_id='test', cache=cache, arg2='username', arg3='password')
         def function_to_be_decorated(arg1, arg2, arg3, arg4='bar'):
@@ -85,19 +81,8 @@ class TestAwsSecretsManagerCachingInjectKeywordedSecretStringDecorator(unittest.
         function_to_be_decorated('foo')
 
     def test_valid_json_with_no_secret_kwarg(self):
-        secret = {
-            'username': 'secret_username',
-            'password': 'secret_password'
-        }
-
-        secret_string = json.dumps(secret)
-
-        response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
-        version_response = {'SecretString': secret_string}
-        cache = SecretCache(client=self.get_client(response, versions, version_response))
+        secret = self.secret
+        cache = self.cache
 
         @InjectKeywordedSecretString('test', cache=cache, func_username='username', func_password='password')
         def function_to_be_decorated(func_username, func_password, keyworded_argument='foo'):
@@ -110,11 +95,8 @@ class TestAwsSecretsManagerCachingInjectKeywordedSecretStringDecorator(unittest.
     def test_invalid_json(self):
         secret = 'not json'
         response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
         version_response = {'SecretString': secret}
-        cache = SecretCache(client=self.get_client(response, versions, version_response))
+        cache = SecretCache(client=self.get_client(response, stubbed_client.CURRENT_VERSIONS, version_response))
 
         with self.assertRaises((RuntimeError, json.decoder.JSONDecodeError)):
             @InjectKeywordedSecretString(secret_id='test', cache=cache, func_username='username',
@@ -128,11 +110,8 @@ class TestAwsSecretsManagerCachingInjectKeywordedSecretStringDecorator(unittest.
         secret = {'username': 'secret_username'}
         secret_string = json.dumps(secret)
         response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
         version_response = {'SecretString': secret_string}
-        cache = SecretCache(client=self.get_client(response, versions, version_response))
+        cache = SecretCache(client=self.get_client(response, stubbed_client.CURRENT_VERSIONS, version_response))
 
         with self.assertRaises((RuntimeError, ValueError)):
             @InjectKeywordedSecretString(secret_id='test', cache=cache, func_username='username',
@@ -142,29 +121,84 @@ class TestAwsSecretsManagerCachingInjectKeywordedSecretStringDecorator(unittest.
 
             function_to_be_decorated()
 
+    def test_missing_key_message(self):
+        cache = Mock()
+        cache.get_secret_string.return_value = json.dumps({'username': 'secret_username'})
+
+        with self.assertRaisesRegex(RuntimeError, 'does not contain key password'):
+            InjectKeywordedSecretString(secret_id='test', cache=cache, func_username='username',
+                                        func_password='password')(lambda func_username, func_password: None)
+
+    def test_large_integer(self):
+        cache = Mock()
+        cache.get_secret_string.return_value = '{"account": 123456789012345678901234567890}'
+
+        @InjectKeywordedSecretString(secret_id='test', cache=cache, account='account')
+        def function_to_be_decorated(account):
+            return account
+
+        self.assertEqual(function_to_be_decorated(), 123456789012345678901234567890)
+
+    def test_no_kwargs(self):
+        cache = Mock()
+        cache.get_secret_string.return_value = json.dumps({'username': 'secret_username'})
+
+        @InjectKeywordedSecretString(secret_id='test', cache=cache)
+        def function_to_be_decorated(arg1='foo'):
+            return arg1
+
+        self.assertEqual(function_to_be_decorated(), 'foo')
+
+    def test_rotated_secret(self):
+        cache = Mock()
+        cache.get_secret_string.return_value = json.dumps({'username': 'old'})
+
+        @InjectKeywordedSecretString(secret_id='test', cache=cache, func_username='username')
+        def function_to_be_decorated(func_username):
+            return func_username
+
+        self.assertEqual(function_to_be_decorated(), 'old')
+        cache.get_secret_string.return_value = json.dumps({'username': 'new'})
+        self.assertEqual(function_to_be_decorated(), 'new')
+
+    def test_unchanged_secret_not_parsed(self):
+        cache = Mock()
+        cache.get_secret_string.return_value = json.dumps({'username': 'secret_username'})
+        with patch.object(InjectKeywordedSecretString, '_resolve_kwargs', autospec=True,
+                          side_effect=InjectKeywordedSecretString._resolve_kwargs) as resolve_mock:
+            @InjectKeywordedSecretString(secret_id='test', cache=cache, func_username='username')
+            def function_to_be_decorated(func_username):
+                return func_username
+
+            for _ in range(3):
+                self.assertEqual(function_to_be_decorated(), 'secret_username')
+        resolve_mock.assert_called_once()
+
+    def test_unchanged_hooked_secret_not_parsed(self):
+        config = SecretCacheConfig(secret_cache_hook=DummySecretCacheHook())
+        cache = _primed_cache(stubbed_client.create_client(), json.dumps({'username': 'secret_username'}), config)
+        self.assertIsNot(cache.get_secret_string('test'), cache.get_secret_string('test'))
+        with patch.object(InjectKeywordedSecretString, '_resolve_kwargs', autospec=True,
+                          return_value={'func_username': 'secret_username'}) as resolve_mock:
+            @InjectKeywordedSecretString(secret_id='test', cache=cache, func_username='username')
+            def function_to_be_decorated(func_username):
+                return func_username
+
+            for _ in range(3):
+                self.assertEqual(function_to_be_decorated(), 'secret_username')
+        resolve_mock.assert_called_once()
+
 
 class TestAwsSecretsManagerCachingInjectSecretStringDecorator(unittest.TestCase):
+    secret = 'not json'
 
-    def get_client(self, response={}, versions=None, version_response=None):
-        client = botocore.session.get_session().create_client('secretsmanager', region_name='us-west-2')
-        stubber = Stubber(client)
-        expected_params = {'SecretId': 'test'}
-        if versions:
-            response['VersionIdsToStages'] = versions
-        stubber.add_response('describe_secret', response, expected_params)
-        if version_response is not None:
-            stubber.add_response('get_secret_value', version_response)
-        stubber.activate()
-        return client
+    @classmethod
+    def setUpClass(cls):
+        cls.cache = _primed_cache(stubbed_client.create_client(), cls.secret)
 
     def test_string(self):
-        secret = 'not json'
-        response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
-        version_response = {'SecretString': secret}
-        cache = SecretCache(client=self.get_client(response, versions, version_response))
+        secret = self.secret
+        cache = self.cache
 
         @InjectSecretString('test', cache)
         def function_to_be_decorated(arg1, arg2, arg3):
@@ -176,13 +210,8 @@ class TestAwsSecretsManagerCachingInjectSecretStringDecorator(unittest.TestCase)
         self.assertEqual(function_to_be_decorated('foo', 'bar'), 'OK')
 
     def test_string_with_additional_kwargs(self):
-        secret = 'not json'
-        response = {}
-        versions = {
-            '01234567890123456789012345678901': ['AWSCURRENT']
-        }
-        version_response = {'SecretString': secret}
-        cache = SecretCache(client=self.get_client(response, versions, version_response))
+        secret = self.secret
+        cache = self.cache
 
         @InjectSecretString('test', cache)
         def function_to_be_decorated(arg1, arg2, arg3):
@@ -191,3 +220,15 @@ class TestAwsSecretsManagerCachingInjectSecretStringDecorator(unittest.TestCase)
             self.assertEqual(arg3, 'bar')
 
         function_to_be_decorated(arg2='foo', arg3='bar')
+
+    def test_rotated_secret(self):
+        cache = Mock()
+        cache.get_secret_string.return_value = 'old'
+
+        @InjectSecretString('test', cache)
+        def function_to_be_decorated(arg1):
+            return arg1
+
+        self.assertEqual(function_to_be_decorated(), 'old')
+        cache.get_secret_string.return_value = 'new'
+        self.assertEqual(function_to_be_decorated(), 'new')
@@ -14,124 +14,147 @@
 Unit test suite for items module
 """
 import unittest
-from datetime import timezone, datetime, timedelta
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock, patch
 
-from aws_secretsmanager_caching.cache.items import SecretCacheObject, SecretCacheItem
+import pytest
+from aws_secretsmanager_caching.cache.items import SecretCacheObject, SecretCacheItem, SecretCacheVersion, _fast_clone
 from aws_secretsmanager_caching.config import SecretCacheConfig
 
+pytestmark = [pytest.mark.unit, pytest.mark.local]
 
-class TestSecretCacheObject(unittest.TestCase):
+# Shared by the tests that only read the default options, never mutate it
+DEFAULT_CONFIG = SecretCacheConfig()
 
-    def setUp(self):
-        pass
+# After 11 failures the retry delay is min(1 * 2**11, 3600) ms
+RETRY_EXCEPTION_COUNT = 11
+EXPECTED_RETRY_DELAY = 2.048
+
+
+class FakeClock:
+    """Stands in for the time module inside the items module"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
 
-    def tearDown(self):
-        pass
+    def monotonic(self):
+        return self.now
 
-    class TestObject(SecretCacheObject):
+    def sleep(self, seconds):
+        self.now += seconds
 
-        def __init__(self, config, client, secret_id):
-            super(TestSecretCacheObject.TestObject, self).__init__(config, client, secret_id)
 
-        def _execute_refresh(self):
-            super(TestSecretCacheObject.TestObject, self)._execute_refresh()
+class FakeClient:
+    """Minimal client whose DescribeSecret call always returns the same result"""
 
-        def _get_version(self, version_stage):
-            return super(TestSecretCacheObject.TestObject, self)._get_version(version_stage)
+    def describe_secret(self, **kwargs):
+        return "test"
+
+
+def fake_clock():
+    clock = FakeClock()
+    return clock, patch('aws_secretsmanager_caching.cache.items.time', clock)
+
+
+class TestSecretCacheObject(unittest.TestCase):
 
     def test_simple(self):
-        sco = TestSecretCacheObject.TestObject(SecretCacheConfig(), None, None)
+        sco = SecretCacheObject(DEFAULT_CONFIG, None, None)
         self.assertIsNone(sco.get_secret_value())
 
     def test_simple_2(self):
-        sco = TestSecretCacheObject.TestObject(SecretCacheConfig(), None, None)
+        sco = SecretCacheObject(DEFAULT_CONFIG, None, None)
         self.assertIsNone(sco.get_secret_value())
         sco._exception = Exception("test")
         self.assertRaises(Exception, sco.get_secret_value)
 
-    def test_refresh_now(self):
-        config = SecretCacheConfig()
+    def test_result_without_hook(self):
+        sco = SecretCacheObject(DEFAULT_CONFIG, None, None)
+        result = {'SecretString': 'test'}
+        sco._set_result(result)
+        self.assertIs(sco._result, result)
+        self.assertIs(sco._get_result(), result)
 
-        client_mock = Mock()
-        client_mock.describe_secret = Mock()
-        client_mock.describe_secret.return_value = "test"
-        secret_cache_item = SecretCacheItem(config, client_mock, None)
-        secret_cache_item._next_refresh_time = datetime.now(timezone.utc) + timedelta(days=30)
-        secret_cache_item._refresh_needed = False
-        self.assertFalse(secret_cache_item._is_refresh_needed())
+    def test_refresh_now(self):
+        config = DEFAULT_CONFIG
 
-        old_refresh_time = secret_cache_item._next_refresh_time
-        self.assertTrue(old_refresh_time > datetime.now(timezone.utc) + timedelta(days=29))
+        clock, clock_patch = fake_clock()
+        with clock_patch:
+            secret_cache_item = SecretCacheItem(config, FakeClient(), None)
+            secret_cache_item._next_refresh_time = clock.now + 30 * 24 * 3600
+            secret_cache_item._refresh_needed = False
+            self.assertFalse(secret_cache_item._is_refresh_needed())
 
-        secret_cache_item.refresh_secret_now()
-        new_refresh_time = secret_cache_item._next_refresh_time
+            secret_cache_item.refresh_secret_now()
 
         ttl = config.secret_refresh_interval
 
-        # New refresh time will use the ttl and will be less than the old refresh time that was artificially set a month ahead
-        # The new refresh time will be between now + ttl and now + (ttl / 2) if the secret was immediately refreshed
-        self.assertTrue(new_refresh_time < old_refresh_time and new_refresh_time < datetime.now(timezone.utc) + timedelta(ttl))
+        # The month-ahead refresh time is replaced by one ttl-based interval from the end of the jitter sleep
+        self.assertGreaterEqual(secret_cache_item._next_refresh_time, clock.now + ttl // 2)
+        self.assertLessEqual(secret_cache_item._next_refresh_time, clock.now + ttl)
 
-    def test_datetime_fix_is_refresh_needed(self):
-        secret_cached_object = TestSecretCacheObject.TestObject(SecretCacheConfig(), None, None)
+    def test_refresh_now_waits_for_retry(self):
+        secret_cache_item = SecretCacheItem(DEFAULT_CONFIG, FakeClient(), None)
+        clock, clock_patch = fake_clock()
+        start = clock.now
+        secret_cache_item._exception = Exception("test")
+        secret_cache_item._next_retry_time = start + 10
 
-        # Variable values set in order to be able to test modified line with assert statement (False is not None)
-        secret_cached_object._next_retry_time = datetime.now(tz=timezone.utc)
-        secret_cached_object._refresh_needed = False
-        secret_cached_object._exception = not None
+        with clock_patch:
+            secret_cache_item.refresh_secret_now()
 
-        self.assertTrue(secret_cached_object._is_refresh_needed())
+        # The pending retry delay outweighs the jitter sleep
+        self.assertEqual(clock.now, start + 10)
 
-    def test_datetime_fix_refresh(self):
-        exp_factor = 11
+    def test_datetime_fix_is_refresh_needed(self):
+        exception = Exception("test")
+        # (refresh_needed, exception, seconds until retry, expected)
+        cases = (
+            (True, None, None, True),
+            (False, None, None, False),
+            (False, exception, None, False),
+            (False, exception, 0, True),
+            (False, exception, 1, False),
+        )
+        clock, clock_patch = fake_clock()
+        with clock_patch:
+            for refresh_needed, exc, retry_in, expected in cases:
+                with self.subTest(refresh_needed=refresh_needed, exception=exc, retry_in=retry_in):
+                    secret_cached_object = SecretCacheObject(DEFAULT_CONFIG, None, None)
+                    secret_cached_object._refresh_needed = refresh_needed
+                    secret_cached_object._exception = exc
+                    secret_cached_object._next_retry_time = None if retry_in is None else clock.now + retry_in
+                    self.assertIs(secret_cached_object._is_refresh_needed(), expected)
 
+    def test_datetime_fix_refresh(self):
         secret_cached_object = SecretCacheObject(
             SecretCacheConfig(exception_retry_delay_base=1, exception_retry_growth_factor=2),
             None, None
         )
-        secret_cached_object._set_result = Mock(side_effect=Exception("exception used for test"))
         secret_cached_object._refresh_needed = True
-        secret_cached_object._exception_count = exp_factor  # delay = min(1*(2^exp_factor) = 2048, 3600)
+        secret_cached_object._exception_count = RETRY_EXCEPTION_COUNT
 
-        t_before = datetime.now(tz=timezone.utc)
-        secret_cached_object._SecretCacheObject__refresh()
-        t_after = datetime.now(tz=timezone.utc)
+        clock, clock_patch = fake_clock()
+        with clock_patch, patch.object(SecretCacheObject, '_set_result',
+                                       side_effect=Exception("exception used for test")):
+            secret_cached_object._SecretCacheObject__refresh()
 
-        t_before_delay = t_before + timedelta(
-            milliseconds=secret_cached_object._config.exception_retry_delay_base * (
-                secret_cached_object._config.exception_retry_growth_factor ** exp_factor
-            )
-        )
-        self.assertLessEqual(t_before_delay, secret_cached_object._next_retry_time)
-
-        t_after_delay = t_after + timedelta(
-            milliseconds=secret_cached_object._config.exception_retry_delay_base * (
-                secret_cached_object._config.exception_retry_growth_factor ** exp_factor
-            )
-        )
-        self.assertGreaterEqual(t_after_delay, secret_cached_object._next_retry_time)
+        self.assertEqual(secret_cached_object._next_retry_time, clock.now + EXPECTED_RETRY_DELAY)
 
 
 class TestSecretCacheItem(unittest.TestCase):
     def setUp(self):
-        pass
-
-    def tearDown(self):
-        pass
+        # Tests that check construction itself build their own item
+        self.secret_cache_item = SecretCacheItem(DEFAULT_CONFIG, FakeClient(), None)
 
     def test_datetime_fix_SCI_init(self):
-        config = SecretCacheConfig()
-        t_before = datetime.now(tz=timezone.utc)
-        secret_cache_item = SecretCacheItem(config, None, None)
-        t_after = datetime.now(tz=timezone.utc)
+        clock, clock_patch = fake_clock()
+        with clock_patch:
+            secret_cache_item = SecretCacheItem(DEFAULT_CONFIG, None, None)
 
-        self.assertGreaterEqual(secret_cache_item._next_refresh_time, t_before)
-        self.assertLessEqual(secret_cache_item._next_refresh_time, t_after)
+        self.assertEqual(secret_cache_item._next_refresh_time, clock.now)
 
     def test_datetime_fix_refresh_needed(self):
-        config = SecretCacheConfig()
-        secret_cache_item = SecretCacheItem(config, None, None)
+        secret_cache_item = self.secret_cache_item
 
         # Variable values set in order to be able to test modified line with assert statement (False is not None)
         secret_cache_item._refresh_needed = False
@@ -141,21 +164,88 @@ class TestSecretCacheItem(unittest.TestCase):
         self.assertTrue(secret_cache_item._is_refresh_needed())
 
     def test_datetime_fix_execute_refresh(self):
+        ttl = DEFAULT_CONFIG.secret_refresh_interval
+        secret_cache_item = self.secret_cache_item
+
+        clock, clock_patch = fake_clock()
+        with clock_patch, patch('aws_secretsmanager_caching.cache.items.randint', return_value=ttl) as randint:
+            secret_cache_item._execute_refresh()
+
+        # Check that secret_refresh_interval addition works as intended
+        randint.assert_called_once_with(ttl // 2, ttl)
+        self.assertEqual(secret_cache_item._next_refresh_time, clock.now + ttl)
+
+    def test_stage_index(self):
+        secret_cache_item = self.secret_cache_item
+        secret_cache_item._set_result({
+            'VersionIdsToStages': {
+                'v1': ['AWSCURRENT', 'custom'],
+                'v2': ['AWSPREVIOUS', 'custom'],
+            }
+        })
+
+        self.assertEqual(secret_cache_item._stage_index, {
+            'AWSCURRENT': 'v1',
+            'AWSPREVIOUS': 'v2',
+            'custom': 'v1',
+        })
+
+    def test_stage_index_no_versions(self):
+        self.assertEqual(SecretCacheItem._get_stage_index(None), {})
+        self.assertEqual(SecretCacheItem._get_stage_index({'Name': 'test'}), {})
+
+
+class TestSecretCacheVersion(unittest.TestCase):
+
+    def test_get_secret_value_no_copy(self):
         client_mock = Mock()
-        client_mock.describe_secret = Mock()
-        client_mock.describe_secret.return_value = "test"
+        client_mock.get_secret_value.return_value = {'SecretString': 'test'}
+        secret_cache_version = SecretCacheVersion(DEFAULT_CONFIG, client_mock, None, None)
 
-        config = SecretCacheConfig()
-        secret_cache_item = SecretCacheItem(config, client_mock, None)
+        first = secret_cache_version.get_secret_value()
+        self.assertEqual(first, {'SecretString': 'test'})
+        self.assertIs(first, secret_cache_version.get_secret_value())
 
-        t_before = datetime.now(tz=timezone.utc)
-        secret_cache_item._execute_refresh()
-        t_after = datetime.now(tz=timezone.utc)
+    def test_get_secret_value_copy_on_get(self):
+        client_mock = Mock()
+        client_mock.get_secret_value.return_value = {'SecretString': 'test'}
+        secret_cache_version = SecretCacheVersion(SecretCacheConfig(copy_on_get=True), client_mock, None, None)
 
-        # Make sure that the timezone is correctly set
-        self.assertEqual(secret_cache_item._next_refresh_time.tzinfo, timezone.utc)
+        first = secret_cache_version.get_secret_value()
+        first['SecretString'] = 'changed'
+        self.assertEqual(secret_cache_version.get_secret_value(), {'SecretString': 'test'})
 
-        # Check that secret_refresh_interval addition works as intended
-        self.assertGreaterEqual(secret_cache_item._next_refresh_time, t_before)
-        t_max_after = t_after + timedelta(seconds=config.secret_refresh_interval)
-        self.assertLessEqual(secret_cache_item._next_refresh_time, t_max_after)
+    def test_get_secret_value_cached_skips_lock(self):
+        client_mock = Mock()
+        client_mock.get_secret_value.return_value = {'SecretString': 'test'}
+        secret_cache_version = SecretCacheVersion(DEFAULT_CONFIG, client_mock, None, None)
+        secret_cache_version.get_secret_value()
+
+        secret_cache_version._lock = MagicMock()
+        self.assertEqual(secret_cache_version.get_secret_value(), {'SecretString': 'test'})
+        secret_cache_version._lock.__enter__.assert_not_called()
+        client_mock.get_secret_value.assert_called_once()
+
+    def test_get_secret_value_not_thread_safe(self):
+        client_mock = Mock()
+        client_mock.get_secret_value.return_value = {'SecretString': 'test'}
+        secret_cache_version = SecretCacheVersion(SecretCacheConfig(thread_safe=False), client_mock, None, None)
+        self.assertEqual(secret_cache_version.get_secret_value(), {'SecretString': 'test'})
+
+
+class TestFastClone(unittest.TestCase):
+
+    def test_fast_clone(self):
+        value = {'SecretString': 'test', 'VersionStages': ['AWSCURRENT'], 'Metadata': {'Count': 1}}
+        clone = _fast_clone(value)
+        self.assertEqual(clone, value)
+        self.assertIsNot(clone, value)
+        self.assertIsNot(clone['VersionStages'], value['VersionStages'])
+        self.assertIsNot(clone['Metadata'], value['Metadata'])
+        self.assertIs(clone['SecretString'], value['SecretString'])
+
+    def test_fast_clone_other_types(self):
+        value = {'Custom': {1, 2}}
+        clone = _fast_clone(value)
+        self.assertEqual(clone, value)
+        self.assertIsNot(clone['Custom'], value['Custom'])
@@ -13,10 +13,13 @@
 """
 Unit test suite for high-level functions in aws_secretsmanager_caching
 """
+import threading
 import unittest
+from unittest.mock import Mock, patch
 
 import pytest
-from aws_secretsmanager_caching.cache.lru import LRUCache
+from aws_secretsmanager_caching.cache import lru
+from aws_secretsmanager_caching.cache.lru import LRUCache, StripedLRUCache
 
 pytestmark = [pytest.mark.unit, pytest.mark.local]
 
@@ -24,13 +27,22 @@ pytestmark = [pytest.mark.unit, pytest.mark.local]
 class TestLRUCache(unittest.TestCase):
 
     def test_lru_cache_max(self):
-        cache = LRUCache(max_size=10)
-        for n in range(100):
-            cache.put_if_absent(n, n)
-        for n in range(90):
-            self.assertIsNone(cache.get(n))
-        for n in range(91, 100):
-            self.assertIsNotNone(cache.get(n))
+        # Inserting 0..99 in order keeps only the newest max_size keys
+        for max_size, survivors in ((10, range(90, 100)), (1, range(99, 100))):
+            with self.subTest(max_size=max_size):
+                cache = LRUCache(max_size=max_size)
+                for n in range(100):
+                    cache.put_if_absent(n, n)
+                self.assertEqual([n for n in range(100) if cache.get(n) is not None], list(survivors))
+                self.assertEqual([cache.get(n) for n in survivors], list(survivors))
+
+    def test_lru_cache_zero(self):
+        # A zero-size cache never retains anything, one key is enough to show it
+        cache = LRUCache(max_size=0)
+        cache.put_if_absent(42, 42)
+        self.assertIsNone(cache.get(42))
+        self.assertEqual(cache.get_or_create(42, lambda: 42), 42)
+        self.assertIsNone(cache.get(42))
 
     def test_lru_cache_none(self):
         cache = LRUCache(max_size=10)
@@ -38,35 +50,129 @@ class TestLRUCache(unittest.TestCase):
 
     def test_lru_cache_recent(self):
         cache = LRUCache(max_size=10)
-        for n in range(100):
+        for n in range(10):
             cache.put_if_absent(n, n)
-            cache.get(0)
-        for n in range(1, 91):
-            self.assertIsNone(cache.get(n))
-        for n in range(92, 100):
-            self.assertIsNotNone(cache.get(n))
-        self.assertIsNotNone(cache.get(0))
+        # Reading the oldest key makes 1 the next eviction candidate instead
+        cache.get(0)
+        cache.put_if_absent(10, 10)
+        self.assertEqual([n for n in range(11) if cache.get(n) is not None], [0, *range(2, 11)])
 
-    def test_lru_cache_zero(self):
-        cache = LRUCache(max_size=0)
-        for n in range(100):
-            cache.put_if_absent(n, n)
-            self.assertIsNone(cache.get(n))
-        for n in range(100):
-            self.assertIsNone(cache.get(n))
+    def test_lru_cache_if_absent(self):
+        cache = LRUCache(max_size=1)
+        self.assertTrue(cache.put_if_absent(1000, 1000))
+        self.assertFalse(cache.put_if_absent(1000, 0))
+        self.assertTrue(all(cache.get(n) is None for n in range(100)))
+        self.assertEqual(cache.get(1000), 1000)
+
+    @patch('aws_secretsmanager_caching.cache.lru._NativeLRU', None)
+    def test_lru_cache_get_while_locked(self):
+        cache = LRUCache(max_size=2)
+        cache.put_if_absent(0, 0)
+        cache.put_if_absent(1, 1)
+        locked = threading.Event()
+        release = threading.Event()
+
+        def hold_lock():
+            with cache._lock:
+                locked.set()
+                release.wait()
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait()
+        try:
+            # The read does not block and skips the promotion
+            self.assertEqual(cache.get(0), 0)
+        finally:
+            release.set()
+            holder.join()
+        cache.put_if_absent(2, 2)
+        self.assertIsNone(cache.get(0))
+        self.assertEqual(cache.get(1), 1)
+
+    def test_lru_cache_get_or_create(self):
+        cache = LRUCache(max_size=2)
+        factory = Mock(return_value='created')
+        self.assertEqual(cache.get_or_create(1, factory), 'created')
+        self.assertEqual(cache.get_or_create(1, factory), 'created')
+        factory.assert_called_once_with()
+        self.assertEqual(cache.get(1), 'created')
+
+    def test_lru_cache_get_or_create_existing(self):
+        cache = LRUCache(max_size=2)
+        cache.put_if_absent(1, 1)
+        factory = Mock()
+        self.assertEqual(cache.get_or_create(1, factory), 1)
+        factory.assert_not_called()
 
-    def test_lru_cache_one(self):
+    def test_lru_cache_get_or_create_evicts(self):
         cache = LRUCache(max_size=1)
+        cache.get_or_create(1, lambda: 1)
+        cache.get_or_create(2, lambda: 2)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get(2), 2)
+
+    @unittest.skipIf(lru._NativeLRU is None, 'lru-dict is not installed')
+    def test_lru_cache_native(self):
+        self.assertTrue(LRUCache(max_size=1)._native)
+        self.assertFalse(LRUCache(max_size=0)._native)
+
+    @patch('aws_secretsmanager_caching.cache.lru._NativeLRU', None)
+    def test_lru_cache_fallback(self):
+        cache = LRUCache(max_size=1)
+        self.assertFalse(cache._native)
+        cache.put_if_absent(1, 1)
+        cache.put_if_absent(2, 2)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get(2), 2)
+
+    def test_lru_cache_not_thread_safe(self):
+        cache = LRUCache(max_size=1, thread_safe=False)
+        self.assertIsInstance(cache._lock, lru._NullLock)
+        self.assertTrue(cache.put_if_absent(1, 1))
+        self.assertEqual(cache.get_or_create(2, lambda: 2), 2)
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(cache.get(2), 2)
+
+
+class TestStripedLRUCache(unittest.TestCase):
+
+    def test_striped_lru_cache_max(self):
+        cache = StripedLRUCache(max_size=32, stripes=4)
         for n in range(100):
             cache.put_if_absent(n, n)
+        self.assertEqual(sum(cache.get(n) is not None for n in range(100)), 32)
+
+    def test_striped_lru_cache_default_holds_max_size(self):
+        # The default single stripe keeps the exact max_size guarantee
+        for max_size in (16, 100, 1024):
+            with self.subTest(max_size=max_size):
+                cache = StripedLRUCache(max_size=max_size)
+                names = [f"secret-{n}" for n in range(max_size)]
+                for name in names:
+                    cache.put_if_absent(name, name)
+                self.assertTrue(all(cache.get(name) == name for name in names))
+
+    def test_striped_lru_cache_small(self):
+        # More stripes than capacity still caches up to max_size items
+        cache = StripedLRUCache(max_size=3, stripes=16)
+        for n in range(3):
+            cache.put_if_absent(n, n)
             self.assertEqual(cache.get(n), n)
-        for n in range(99):
-            self.assertIsNone(cache.get(n))
-        self.assertEqual(cache.get(99), 99)
+        self.assertEqual(len(cache._stripes), 3)
 
-    def test_lru_cache_if_absent(self):
-        cache = LRUCache(max_size=1)
-        for n in range(100):
-            cache.put_if_absent(1000, 1000)
-            self.assertIsNone(cache.get(n))
-        self.assertEqual(cache.get(1000), 1000)
+    def test_striped_lru_cache_zero(self):
+        cache = StripedLRUCache(max_size=0)
+        cache.put_if_absent(1, 1)
+        self.assertIsNone(cache.get(1))
+
+    def test_striped_lru_cache_if_absent(self):
+        cache = StripedLRUCache(max_size=10, stripes=2)
+        self.assertTrue(cache.put_if_absent(1, 1))
+        self.assertFalse(cache.put_if_absent(1, 2))
+        self.assertEqual(cache.get(1), 1)
+
+    def test_striped_lru_cache_get_or_create(self):
+        cache = StripedLRUCache(max_size=10, stripes=2)
+        self.assertEqual(cache.get_or_create(1, lambda: 'created'), 'created')
+        self.assertEqual(cache.get(1), 'created')